@@ -86,19 +86,24 @@ class Weekly():
     @task
     def gmail_task(self) -> Task:
         return Task(
-            config=self.tasks_config['gmail_task'],   
+            config=self.tasks_config['gmail_task'],
+            context=[self.calendar_task()],
+            async_execution=True
         )
     
     @task
     def hubspot_task(self) -> Task:
         return Task(
-            config=self.tasks_config['hubspot_task'],   
+            config=self.tasks_config['hubspot_task'],
+            context=[self.calendar_task()],
+            async_execution=True
         )
 
     @task
     def summary_task(self) -> Task:
         return Task(
-            config=self.tasks_config['summary_task'],        
+            config=self.tasks_config['summary_task'],
+            context=[self.calendar_task(), self.gmail_task(), self.hubspot_task()]
         )
     
     @task
@@ -0,0 +1,86 @@
+# _google_auth.py
+ 
+import threading
+from functools import lru_cache
+from typing import Callable
+from datetime import datetime, timedelta, timezone
+import httplib2
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
+ 
+# Refresh slightly ahead of expiry so a call never starts with a token that dies mid-flight
+REFRESH_MARGIN = timedelta(seconds=60)
+ 
+_refresh_lock = threading.Lock()
+_thread_local = threading.local()
+ 
+ 
+def _needs_refresh(creds: Credentials) -> bool:
+    if not creds.refresh_token:
+        return False
+    if not creds.token:
+        return True
+    if creds.expiry is None:
+        return False
+    # google-auth stores expiry as naive UTC
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return creds.expiry - now < REFRESH_MARGIN
+ 
+ 
+def refresh_if_needed(creds: Credentials) -> Credentials:
+    """
+    Refresh cached credentials in place when they are expired or about to be.
+    The lock keeps concurrent tool calls from hitting the token endpoint twice.
+    """
+    if not _needs_refresh(creds):
+        return creds
+    with _refresh_lock:
+        if _needs_refresh(creds):
+            creds.refresh(Request())
+    return creds
+ 
+ 
+def _thread_http(creds: Credentials) -> AuthorizedHttp:
+    # httplib2.Http is not thread-safe, so each thread keeps its own
+    # authorized connection per credentials object
+    https = getattr(_thread_local, "https", None)
+    if https is None:
+        https = _thread_local.https = {}
+    http = https.get(creds)
+    if http is None:
+        http = https[creds] = AuthorizedHttp(creds, http=httplib2.Http())
+    return http
+ 
+ 
+def _build_service(service_name: str, version: str, creds: Credentials):
+    # The service itself only holds the parsed discovery document; every request
+    # it creates is bound to the creating thread's own connection, so build and
+    # execute a request on the same thread.
+    def request_builder(_http, *args, **kwargs):
+        return HttpRequest(_thread_http(creds), *args, **kwargs)
+ 
+    return build(
+        service_name, version, credentials=creds, requestBuilder=request_builder,
+        cache_discovery=False, static_discovery=True,
+    )
+ 
+ 
+# Credentials and services are cached per token so repeated tool calls skip
+# re-parsing the token and the discovery document. Each tool passes its own
+# creds_factory, since every token env var uses a different JSON layout.
+@lru_cache(maxsize=8)
+def get_credentials(token_json: str, creds_factory: Callable[[str], Credentials]) -> Credentials:
+    return creds_factory(token_json)
+ 
+ 
+@lru_cache(maxsize=8)
+def get_service(service_name: str, version: str, token_json: str, creds_factory: Callable[[str], Credentials]):
+    """
+    Cached Google API service for a token. It shares the cached Credentials,
+    so refresh_if_needed on those also covers the service, and it is safe to
+    share across threads because each thread gets its own connection.
+    """
+    return _build_service(service_name, version, get_credentials(token_json, creds_factory))
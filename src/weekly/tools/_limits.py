@@ -0,0 +1,54 @@
+# _limits.py
+
+from threading import BoundedSemaphore
+from googleapiclient.errors import HttpError
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+# Caps on in-flight requests per provider, shared by every tool (and every crew
+# task thread) so parallel agents don't trip per-user rate limits together.
+GOOGLE_SEM = BoundedSemaphore(5)
+HUBSPOT_SEM = BoundedSemaphore(5)
+
+
+def _is_google_rate_limit(exc: BaseException) -> bool:
+    if not isinstance(exc, HttpError):
+        return False
+    if exc.resp.status == 429:
+        return True
+    # Google also reports quota throttling as 403 rateLimitExceeded/userRateLimitExceeded
+    return exc.resp.status == 403 and "ratelimitexceeded" in str(exc.content).lower()
+
+
+def _is_hubspot_rate_limit(exc: BaseException) -> bool:
+    # Each HubSpot sub-package has its own ApiException; they all carry .status
+    return getattr(exc, "status", None) == 429
+
+
+# Only rate-limit rejections are retried: the request was not processed, so
+# retrying is safe even for non-idempotent calls like creating a document.
+google_retry = retry(
+    retry=retry_if_exception(_is_google_rate_limit),
+    wait=wait_exponential(multiplier=1, max=30),
+    stop=stop_after_attempt(4),
+    reraise=True,
+)
+hubspot_retry = retry(
+    retry=retry_if_exception(_is_hubspot_rate_limit),
+    wait=wait_exponential(multiplier=1, max=30),
+    stop=stop_after_attempt(4),
+    reraise=True,
+)
+
+
+@google_retry
+def execute_google(request):
+    """Execute a googleapiclient request (or batch) under GOOGLE_SEM, retrying on rate limits."""
+    with GOOGLE_SEM:
+        return request.execute()
+
+
+@hubspot_retry
+def call_hubspot(fn, *args, **kwargs):
+    """Call a HubSpot SDK method under HUBSPOT_SEM, retrying on 429s."""
+    with HUBSPOT_SEM:
+        return fn(*args, **kwargs)
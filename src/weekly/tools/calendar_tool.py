@@ -7,14 +7,24 @@ from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 import os
-import json
+import orjson
 import re
 from typing import Type
 from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+from weekly.tools._google_auth import get_credentials, get_service, refresh_if_needed
+from weekly.tools._limits import execute_google
+ 
+load_dotenv()
  
 IST = ZoneInfo("Asia/Kolkata") #zone according to location
+_UTC = ZoneInfo("UTC")
+_RFC3339_UTC = "%Y-%m-%dT%H:%M:%SZ"
+_EMPTY: Dict = {}  # shared read-only fallback for missing start/end blocks
+_ZOOM_RE = re.compile(r"\bzoom\.us\b", re.I)
+ 
+ 
+def _parse_token(token_json: str) -> Credentials:
+    return Credentials.from_authorized_user_info(orjson.loads(token_json))
  
 
 class FetchUpcomingMeetingsInput(BaseModel):
@@ -73,17 +83,17 @@ class FetchUpcomingMeetingsTool(BaseTool):
                 end_dt = start_dt + timedelta(days=7)
  
             # Convert to RFC3339 UTC for Calendar API
-            time_min = start_dt.astimezone(ZoneInfo("UTC")).isoformat().replace("+00:00", "Z")
-            time_max = end_dt.astimezone(ZoneInfo("UTC")).isoformat().replace("+00:00", "Z")
+            time_min = start_dt.astimezone(_UTC).strftime(_RFC3339_UTC)
+            time_max = end_dt.astimezone(_UTC).strftime(_RFC3339_UTC)
  
-            events_result = service.events().list(
+            events_result = execute_google(service.events().list(
                 calendarId="primary",
                 timeMin=time_min,
                 timeMax=time_max,
                 singleEvents=True,
                 maxResults=100,
                 orderBy="startTime",
-            ).execute()
+            ))
             events = events_result.get("items", [])
  
             items: List[Dict] = []
@@ -91,35 +101,41 @@ class FetchUpcomingMeetingsTool(BaseTool):
                 if require_zoom and not self._has_zoom(ev):
                     continue
  
-                start_raw = (ev.get("start") or {}).get("dateTime") or (ev.get("start") or {}).get("date")
-                end_raw = (ev.get("end") or {}).get("dateTime") or (ev.get("end") or {}).get("date")
+                start = ev.get("start") or _EMPTY
+                end = ev.get("end") or _EMPTY
+                start_raw = start.get("dateTime") or start.get("date")
+                end_raw = end.get("dateTime") or end.get("date")
  
                 start_local = self._to_local(start_raw)
                 end_local = self._to_local(end_raw)
+                day = start_local.strftime("%A") if start_local else None
+                start_iso_local = start_local.isoformat() if start_local else None
+                end_iso_local = end_local.isoformat() if end_local else None
  
-                attendees = []
-                for a in (ev.get("attendees") or []):
-                    attendees.append({
+                attendees = [
+                    {
                         "name": a.get("displayName"),
                         "email": a.get("email"),
                         "response": a.get("responseStatus"),
-                    })
+                    }
+                    for a in (ev.get("attendees") or ())
+                ]
  
                 items.append({
                     "title": ev.get("summary") or "No Title",
-                    "day": start_local.strftime("%A") if start_local else None,
-                    "start_local": start_local.isoformat() if start_local else None,
-                    "end_local": end_local.isoformat() if end_local else None,
+                    "day": day,
+                    "start_local": start_iso_local,
+                    "end_local": end_iso_local,
                     "event_link": ev.get("htmlLink"),
                     "location": ev.get("location"),
                     "description": ev.get("description"),
                     "attendees": attendees,
                 })
  
-            return json.dumps({"count": len(items), "items": items}, ensure_ascii=False)
+            return orjson.dumps({"count": len(items), "items": items}).decode()
  
         except Exception as e:
-            return json.dumps({"error": f"Calendar fetch failed: {str(e)}"})
+            return orjson.dumps({"error": f"Calendar fetch failed: {str(e)}"}).decode()
  
     # --------------------- Internals ---------------------
  
@@ -129,8 +145,6 @@ class FetchUpcomingMeetingsTool(BaseTool):
         a JSON string produced by Google OAuth flow:
           - GOOGLE_TKN
         """
-        load_dotenv()
- 
         token_env_names = ["GOOGLE_TKN"]
         token_json = None
         for name in token_env_names:
@@ -140,16 +154,15 @@ class FetchUpcomingMeetingsTool(BaseTool):
                 break
  
         if not token_json:
-            return json.dumps({"error": "No calendar token JSON found in env (GOOGLE_TKN)"})
+            return orjson.dumps({"error": "No calendar token JSON found in env (GOOGLE_TKN)"}).decode()
  
         try:
-            info = json.loads(token_json)
-            creds = Credentials.from_authorized_user_info(info)
-            if creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            return build("calendar", "v3", credentials=creds)
+            creds = get_credentials(token_json, _parse_token)
+            refresh_if_needed(creds)
+            # The cached service is bound to the same creds object, so it sees the refresh
+            return get_service("calendar", "v3", token_json, _parse_token)
         except Exception as e:
-            return json.dumps({"error": f"Auth error: {str(e)}"})
+            return orjson.dumps({"error": f"Auth error: {str(e)}"}).decode()
  
     def _parse_iso_local(self, iso_str: str) -> datetime:
         """
@@ -189,4 +202,4 @@ class FetchUpcomingMeetingsTool(BaseTool):
             ev.get("location") or "",
             ev.get("description") or "",
         ])
-        return bool(re.search(r"\bzoom\.us\b", text, flags=re.I))
\ No newline at end of file
+        return bool(_ZOOM_RE.search(text))
\ No newline at end of file
@@ -2,12 +2,26 @@ from typing import Type
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 import os
-import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
-from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from weekly.tools._google_auth import get_credentials, get_service, refresh_if_needed
+from weekly.tools._limits import execute_google
+
+load_dotenv()
+
+def _parse_token(tkn_json: str) -> Credentials:
+    tkn_data = orjson.loads(tkn_json)
+    return Credentials(
+        token=tkn_data["access_token"],
+        refresh_token=tkn_data["refresh_token"],
+        token_uri="https://oauth2.googleapis.com/token",
+        client_id=tkn_data["client_id"],
+        client_secret=tkn_data["client_secret"],
+        scopes=tkn_data["scope"].split()
+    )
 
 class GoogleDocInput(BaseModel):
     """Input schema for GoogleDocTool."""
@@ -20,30 +34,20 @@ class GoogleDocTool(BaseTool):
 
     def _run(self, meeting_summary: str) -> str:
         try:
-            # Load env and token JSON
-            load_dotenv()
+            # Token JSON
             tkn_json = os.getenv("GOOGLE_TKN_DOC")
-            tkn_data = json.loads(tkn_json)
 
             # Setup credentials
-            creds = Credentials(
-                token=tkn_data["access_token"],
-                refresh_token=tkn_data["refresh_token"],
-                token_uri="https://oauth2.googleapis.com/token",
-                client_id=tkn_data["client_id"],
-                client_secret=tkn_data["client_secret"],
-                scopes=tkn_data["scope"].split()
-            )
+            creds = get_credentials(tkn_json, _parse_token)
 
             # Refresh if needed
-            if creds.expired and creds.refresh_token:
-                creds.refresh(Request())
+            refresh_if_needed(creds)
 
             # Google Docs API
-            docs_service = build("docs", "v1", credentials=creds)
+            docs_service = get_service("docs", "v1", tkn_json, _parse_token)
             date = datetime.now().strftime("%A %Y-%m-%d")
             # Create document
-            doc = docs_service.documents().create(body={"title":date }).execute()
+            doc = execute_google(docs_service.documents().create(body={"title":date }))
 
             # Insert text
             requests = [
@@ -54,19 +58,30 @@ class GoogleDocTool(BaseTool):
                     }
                 }
             ]
-            docs_service.documents().batchUpdate(
-                documentId=doc["documentId"], body={"requests": requests}
-            ).execute()
+            def insert_text():
+                return execute_google(docs_service.documents().batchUpdate(
+                    documentId=doc["documentId"], body={"requests": requests}
+                ))
 
             # Google Drive API for permissions
-            drive_service = build("drive", "v3", credentials=creds)
+            drive_service = get_service("drive", "v3", tkn_json, _parse_token)
 
             # Set to "anyone with link can edit"
-            drive_service.permissions().create(
-                fileId=doc["documentId"],
-                body={"type": "anyone", "role": "writer"},
-                fields="id"
-            ).execute()
+            def grant_access():
+                return execute_google(drive_service.permissions().create(
+                    fileId=doc["documentId"],
+                    body={"type": "anyone", "role": "writer"},
+                    fields="id"
+                ))
+
+            # Both only need the document id, so run them concurrently. The text
+            # insert stays on this thread and reuses its cached Docs connection;
+            # the permission grant runs on a short-lived worker, so it pays for
+            # a fresh Drive connection (connections are per thread).
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                access_future = executor.submit(grant_access)
+                insert_text()
+                access_future.result()  # re-raise a failed grant
 
             # Return link
             return f"https://docs.google.com/document/d/{doc['documentId']}/edit"
@@ -2,11 +2,71 @@ from crewai.tools import BaseTool
 from typing import Type, List, Dict, Optional
 from pydantic import BaseModel, Field
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from weekly.tools._google_auth import get_credentials, get_service, refresh_if_needed
+from weekly.tools._limits import GOOGLE_SEM, execute_google, google_retry
 from dotenv import load_dotenv
-import os, json, base64, re
+import os, base64, re
+import orjson
+from collections import deque
 from html import unescape
  
+load_dotenv()
+ 
+GMAIL_BATCH_LIMIT = 100  # max sub-requests Gmail accepts per batch call
+ 
+# Partial-response mask for body fetches: only the MIME tree and body data that
+# _extract_plain_text reads. The innermost bare "parts" keeps deeper nesting intact.
+GMAIL_BODY_FIELDS = (
+    "payload(mimeType,body/data,"
+    "parts(mimeType,body/data,"
+    "parts(mimeType,body/data,"
+    "parts(mimeType,body/data,parts))))"
+)
+ 
+# Sub-request failures (e.g. 429s) only surface through the batch callback, so
+# collect them and re-raise; a retry re-sends just the requests still missing.
+@google_retry
+def _execute_batch(service, requests, responses: Dict[str, dict]) -> None:
+    errors: List[Exception] = []
+ 
+    def collect(request_id, response, exception):
+        if exception is not None:
+            errors.append(exception)
+        else:
+            responses[request_id] = response
+ 
+    batch = service.new_batch_http_request(callback=collect)
+    for request_id, request in requests:
+        if request_id not in responses:
+            batch.add(request, request_id=request_id)
+    with GOOGLE_SEM:
+        batch.execute()
+ 
+    if errors:
+        raise errors[0]
+ 
+# HTML stripping patterns, compiled once. The passes stay separate and ordered:
+# merging them into one alternation changes the output around stray "<"
+# characters (common after unescape), e.g. letting a script body leak through.
+_SCRIPT_RE = re.compile(r"<(script|style).*?>.*?</\1>", re.I | re.S)
+_BR_RE = re.compile(r"<br\s*/?>", re.S)
+_PTAG_RE = re.compile(r"</p\s*>", re.S)
+_TAG_RE = re.compile(r"<[^>]+>", re.S)
+_WS_RE = re.compile(r"[ \t]+\n")
+_MULTINL_RE = re.compile(r"\n{3,}")
+ 
+ 
+def _parse_token(tkn_env: str) -> Credentials:
+    tkn_data = orjson.loads(tkn_env)
+    return Credentials(
+        token=tkn_data["token"],
+        refresh_token=tkn_data.get("refresh_token"),
+        token_uri=tkn_data["token_uri"],
+        client_id=tkn_data["client_id"],
+        client_secret=tkn_data["client_secret"],
+        scopes=tkn_data["scopes"],
+    )
+ 
 class GmailMeetingToolInput(BaseModel):
     query: str = Field(..., description="Gmail search query with optional filters like date or sender.")
     max_results: int = Field(5, description="Maximum number of emails to return (1-10).")
@@ -20,41 +80,34 @@ class GmailMeetingTool(BaseTool):
  
     def _run(self, query: str, max_results: int = 5, include_body: bool = False, body_char_limit: int = 800) -> str:
         try:
-            load_dotenv()
             tkn_env = os.getenv("GMAIL_TKN")
             if not tkn_env:
-                return json.dumps({"error": "GMAIL_TKN not found in environment"})
- 
-            tkn_data = json.loads(tkn_env)
-            creds = Credentials(
-                token=tkn_data["token"],
-                refresh_token=tkn_data.get("refresh_token"),
-                token_uri=tkn_data["token_uri"],
-                client_id=tkn_data["client_id"],
-                client_secret=tkn_data["client_secret"],
-                scopes=tkn_data["scopes"],
-            )
+                return orjson.dumps({"error": "GMAIL_TKN not found in environment"}).decode()
  
-            service = build("gmail", "v1", credentials=creds)
+            creds = get_credentials(tkn_env, _parse_token)
+            refresh_if_needed(creds)
+            # Each thread keeps one keep-alive connection to gmail.googleapis.com;
+            # the list call and the batch endpoint (same host) both ride on it
+            service = get_service("gmail", "v1", tkn_env, _parse_token)
  
             # Bound max_results (keep the tool lightweight)
             max_results = max(1, min(int(max_results), 10))
  
-            search = service.users().messages().list(
+            # list returns ids only (threads.list likewise returns just id/snippet),
+            # so headers always come from the batched gets below
+            search = execute_google(service.users().messages().list(
                 userId="me", q=query, maxResults=max_results
-            ).execute()
+            ))
  
             ids = [m["id"] for m in search.get("messages", [])]
             if not ids:
-                return json.dumps({"count": 0, "items": []})
+                return orjson.dumps({"count": 0, "items": []}).decode()
+ 
+            responses = self._batch_get(service, ids, include_body)
  
             items: List[Dict] = []
             for mid in ids:
-                # Fetch minimal data first
-                msg = service.users().messages().get(
-                    userId="me", id=mid, format="metadata", metadataHeaders=["Subject","From","Date"]
-                ).execute()
- 
+                msg = responses[f"metadata:{mid}"]
                 headers = {h["name"]: h["value"] for h in msg.get("payload", {}).get("headers", [])}
                 subject = headers.get("Subject", "No Subject")
                 sender  = headers.get("From", "No Sender")
@@ -70,79 +123,82 @@ class GmailMeetingTool(BaseTool):
                 }
  
                 if include_body:
-                    # Fetch full only when requested
-                    full = service.users().messages().get(userId="me", id=mid, format="full").execute()
-                    body_text = self._extract_plain_text(full.get("payload", {}))
+                    body_text = self._extract_plain_text(responses[f"full:{mid}"].get("payload", {}))
                     # Truncate hard to protect the LLM context
                     record["body"] = body_text[:body_char_limit] if body_text else ""
  
                 items.append(record)
  
-            return json.dumps({"count": len(items), "items": items})
+            return orjson.dumps({"count": len(items), "items": items}).decode()
  
         except Exception as e:
-            return json.dumps({"error": f"Error while accessing Gmail: {str(e)}"})
+            return orjson.dumps({"error": f"Error while accessing Gmail: {str(e)}"}).decode()
+ 
+    def _batch_get(self, service, ids: List[str], include_body: bool) -> Dict[str, dict]:
+        """
+        Fetch all messages through Gmail's batch endpoint instead of one HTTP
+        round-trip per message. Returns responses keyed by "<format>:<id>".
+        """
+        requests = []
+        for mid in ids:
+            # Fetch minimal data first; full payload only when requested
+            requests.append((f"metadata:{mid}", service.users().messages().get(
+                userId="me", id=mid, format="metadata", metadataHeaders=["Subject","From","Date"]
+            )))
+            if include_body:
+                requests.append((f"full:{mid}", service.users().messages().get(
+                    userId="me", id=mid, format="full", fields=GMAIL_BODY_FIELDS
+                )))
+ 
+        responses: Dict[str, dict] = {}
+        for i in range(0, len(requests), GMAIL_BATCH_LIMIT):
+            _execute_batch(service, requests[i:i + GMAIL_BATCH_LIMIT], responses)
+        return responses
  
     # --- Utilities ---
  
     def _extract_plain_text(self, payload: dict) -> str:
         """
-        Recursively extract text/plain first, else fallback to text/html (stripped),
-        else concatenate text from subparts. Always returns safe, small-ish text.
+        Walk the MIME tree breadth-first and return the shallowest text/plain
+        body, else the shallowest text/html body (stripped), else "".
         """
         if not payload:
             return ""
  
-        # If the message has a direct body
-        data = payload.get("body", {}).get("data")
-        mime = payload.get("mimeType")
-        if data:
-            text = self._safe_b64_to_text(data)
-            if mime == "text/html":
-                return self._strip_html(text)
-            return text
- 
-        # If the message has parts, search for text/plain first
-        parts = payload.get("parts", [])
-        if not parts:
-            return ""
- 
-        # Prefer text/plain
-        for p in parts:
-            if p.get("mimeType") == "text/plain":
-                dt = p.get("body", {}).get("data")
-                if dt:
-                    return self._safe_b64_to_text(dt)
- 
-        # Fallback to text/html
-        for p in parts:
-            if p.get("mimeType") == "text/html":
-                dt = p.get("body", {}).get("data")
-                if dt:
-                    return self._strip_html(self._safe_b64_to_text(dt))
- 
-        # Recurse/concatenate (last resort)
-        texts = []
-        for p in parts:
-            texts.append(self._extract_plain_text(p))
-        return "\n".join(t for t in texts if t).strip()
+        plain = None
+        html = None
+        queue = deque([payload])
+        while queue:
+            part = queue.popleft()
+            mime = part.get("mimeType")
+            data = (part.get("body") or {}).get("data")
+            if data:
+                if mime == "text/plain":
+                    plain = self._safe_b64_to_text(data)
+                    break
+                if mime == "text/html" and html is None:
+                    html = data
+            queue.extend(part.get("parts") or ())
+ 
+        if plain:
+            return plain
+        return self._strip_html(self._safe_b64_to_text(html)) if html else ""
  
     def _safe_b64_to_text(self, data: str) -> str:
         # Gmail uses web-safe base64; pad and decode robustly
-        data = data.replace("-", "+").replace("_", "/")
-        padding = "=" * ((4 - len(data) % 4) % 4)
         try:
-            raw = base64.b64decode(data + padding, validate=False)
-            return unescape(raw.decode("utf-8", errors="replace"))
+            raw = data.encode("ascii")
+            raw += b"=" * ((4 - len(raw) % 4) % 4)
+            return base64.urlsafe_b64decode(raw).decode("utf-8", errors="replace")
         except Exception:
             return ""
  
     def _strip_html(self, html: str) -> str:
         # Very lightweight HTML stripper to keep dependencies minimal
-        text = re.sub(r"(?is)<(script|style).*?>.*?</\1>", "", html)  # remove scripts/styles
-        text = re.sub(r"(?s)<br\s*/?>", "\n", text)
-        text = re.sub(r"(?s)</p\s*>", "\n", text)
-        text = re.sub(r"(?s)<[^>]+>", "", text)  # remove tags
-        text = re.sub(r"[ \t]+\n", "\n", text)
-        text = re.sub(r"\n{3,}", "\n\n", text)
+        text = _SCRIPT_RE.sub("", unescape(html))  # remove scripts/styles
+        text = _BR_RE.sub("\n", text)
+        text = _PTAG_RE.sub("\n", text)
+        text = _TAG_RE.sub("", text)  # remove tags
+        text = _WS_RE.sub("\n", text)
+        text = _MULTINL_RE.sub("\n\n", text)
         return text.strip()
\ No newline at end of file
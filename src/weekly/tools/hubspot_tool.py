@@ -3,17 +3,63 @@
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 from hubspot import HubSpot
+from hubspot.discovery.discovery_base import DiscoveryBase
 from hubspot.crm.objects.meetings import PublicObjectSearchRequest as MeetingSearchRequest
 from hubspot.crm.contacts import PublicObjectSearchRequest as ContactSearchRequest
+from hubspot.crm.companies import BatchReadInputSimplePublicObjectId as CompanyBatchReadInput
+from hubspot.crm.companies import SimplePublicObjectId as CompanyObjectId
+from hubspot.crm.deals import BatchReadInputSimplePublicObjectId as DealBatchReadInput
+from hubspot.crm.deals import SimplePublicObjectId as DealObjectId
 from hubspot.crm.objects.exceptions import ApiException as ObjectsApiException
 from hubspot.crm.contacts.exceptions import ApiException as ContactsApiException
 from hubspot.crm.objects.meetings.exceptions import ApiException as MeetingsApiException
-import json, os
-from typing import Type
+import os
+import orjson
+import threading
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Tuple, Type
 from dotenv import load_dotenv
+from weekly.tools._limits import call_hubspot
  
 load_dotenv()
  
+# Attendees recur across the week's meetings; cache tool results by
+# (meeting_title, email) and company/deal records by (object_type, id) in
+# separate caches so records can't evict tool results.
+_hs_result_cache = TTLCache(maxsize=512, ttl=3600)
+_hs_record_cache = TTLCache(maxsize=512, ttl=3600)
+_hs_cache_lock = threading.Lock()
+ 
+# The HubSpot client only holds config: every `client.crm...._api` access goes
+# through an api_factory that by default builds a new ApiClient (and urllib3
+# pool). Memoize the API instances per token so their pools, and keep-alive
+# connections, are reused across requests and tool calls.
+_hs_apis: dict = {}
+_hs_apis_lock = threading.Lock()
+ 
+ 
+def _cached_api_factory(api_client_package, api_name, config):
+    key = (config.get("access_token"), api_client_package.__name__, api_name)
+    with _hs_apis_lock:
+        api = _hs_apis.get(key)
+        if api is None:
+            api = _hs_apis[key] = DiscoveryBase._default_api_factory(api_client_package, api_name, config)
+    return api
+ 
+ 
+_hs_clients: Dict[str, HubSpot] = {}
+_hs_client_lock = threading.Lock()
+ 
+ 
+def _get_client(access_token: str) -> HubSpot:
+    # Keyed on the token so a rotated HUBSPOT_ACCESS_TKN takes effect
+    with _hs_client_lock:
+        client = _hs_clients.get(access_token)
+        if client is None:
+            client = _hs_clients[access_token] = HubSpot(access_token=access_token, api_factory=_cached_api_factory)
+    return client
+ 
 class HubspotToolInput(BaseModel):
     meeting_title: str = Field(..., description='Title of the event from the calendar')
     email: str = Field(..., description='Email of the attendee from the event')
@@ -27,67 +73,124 @@ class HubSpotSearchTool(BaseTool):
     args_schema: Type[BaseModel] = HubspotToolInput
  
     def _run(self, meeting_title: str, email: str) -> str:
-        try:
-            client = HubSpot(access_token=os.getenv("HUBSPOT_ACCESS_TKN"))
-        except Exception as e:
-            return json.dumps({"found": False, "reason": f"Auth error: {str(e)}"})
+        access_token = os.getenv("HUBSPOT_ACCESS_TKN")
+        if not access_token:
+            return orjson.dumps({"found": False, "reason": "Auth error: HUBSPOT_ACCESS_TKN not found in environment"}).decode()
+ 
+        key = (meeting_title, email)
+        with _hs_cache_lock:
+            cached = _hs_result_cache.get(key)
+        if cached is not None:
+            return cached
  
+        result, cacheable = self._search(_get_client(access_token), meeting_title, email)
+        if cacheable:
+            with _hs_cache_lock:
+                _hs_result_cache[key] = result
+        return result
+ 
+    def _search(self, client: HubSpot, meeting_title: str, email: str) -> Tuple[str, bool]:
+        """
+        Returns the JSON result and whether it may be cached: results are cached
+        only when no sub-call failed (a contact 404 is a clean "not found"),
+        so a transient failure is never remembered.
+        """
+        failed = False
         meeting_obj = None
         contact_obj = None
         companies = []
         deals = []
  
-        # 1) meeting by title (best effort)
-        try:
+        # Capped to stay well under HubSpot's per-second rate limit
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # 1) meeting by title (best effort), runs while the contact is fetched
             mreq = MeetingSearchRequest(query=meeting_title, limit=1)
-            mres = client.crm.objects.meetings.search_api.do_search(public_object_search_request=mreq)
-            if mres and mres.results:
-                meeting_obj = mres.results[0].properties or {}
-        except Exception:
-            meeting_obj = None
- 
-        # 2) contact by email + assoc
-        try:
-            contact = client.crm.objects.basic_api.get_by_id(
-                object_type="contacts",
-                object_id=email,
-                id_property="email",
-                properties=["firstname", "lastname", "email", "phone", "lifecyclestage", "linkedinbio", "hs_linkedinid", "hs_linkedinbio"],
-                associations=["companies", "deals", "meetings"],
+            meeting_future = executor.submit(
+                call_hubspot, client.crm.objects.meetings.search_api.do_search, public_object_search_request=mreq
             )
-            contact_obj = contact.properties or {}
- 
-            # companies
-            if getattr(contact, "associations", None) and "companies" in contact.associations:
-                for company_assoc in contact.associations["companies"].results[:3]:
-                    try:
-                        comp = client.crm.objects.basic_api.get_by_id("companies", company_assoc.id)
-                        companies.append(comp.properties or {})
-                    except Exception:
-                        continue
- 
-            # deals
-            if getattr(contact, "associations", None) and "deals" in contact.associations:
-                for deal_assoc in contact.associations["deals"].results[:3]:
-                    try:
-                        dl = client.crm.objects.basic_api.get_by_id("deals", deal_assoc.id)
-                        deals.append(dl.properties or {})
-                    except Exception:
-                        continue
- 
-        except (ObjectsApiException, ContactsApiException):
-            contact_obj = None
-        except Exception:
-            contact_obj = None
+ 
+            # 2) contact by email + assoc
+            assoc_futures = {}
+            try:
+                contact = call_hubspot(
+                    client.crm.objects.basic_api.get_by_id,
+                    object_type="contacts",
+                    object_id=email,
+                    id_property="email",
+                    properties=["firstname", "lastname", "email", "phone", "lifecyclestage", "linkedinbio", "hs_linkedinid", "hs_linkedinbio"],
+                    associations=["companies", "deals", "meetings"],
+                )
+                contact_obj = contact.properties or {}
+ 
+                # companies + deals: one batch read per object type, run concurrently
+                associations = getattr(contact, "associations", None) or {}
+                for object_type, target in (("companies", companies), ("deals", deals)):
+                    if object_type in associations:
+                        ids = []
+                        for assoc in associations[object_type].results[:3]:
+                            with _hs_cache_lock:
+                                record = _hs_record_cache.get((object_type, assoc.id))
+                            if record is not None:
+                                target.append(record)
+                            else:
+                                ids.append(assoc.id)
+                        if ids:
+                            fut = executor.submit(self._batch_read, client, object_type, ids)
+                            assoc_futures[fut] = (object_type, target)
+ 
+            except (ObjectsApiException, ContactsApiException) as e:
+                contact_obj = None
+                # 404 just means no such contact; anything else is a failed lookup
+                failed = failed or e.status != 404
+            except Exception:
+                contact_obj = None
+                failed = True
+ 
+            for fut in as_completed(assoc_futures):
+                object_type, target = assoc_futures[fut]
+                try:
+                    results = fut.result()
+                except Exception:
+                    failed = True
+                    continue
+                for obj in results:
+                    record = obj.properties or {}
+                    with _hs_cache_lock:
+                        _hs_record_cache[(object_type, obj.id)] = record
+                    target.append(record)
+ 
+            try:
+                mres = meeting_future.result()
+                if mres and mres.results:
+                    meeting_obj = mres.results[0].properties or {}
+            except Exception:
+                meeting_obj = None
+                failed = True
  
         has_anything = any([meeting_obj, contact_obj, companies, deals])
         if not has_anything:
-            return json.dumps({"found": False, "reason": "No HubSpot data found"})
+            return orjson.dumps({"found": False, "reason": "No HubSpot data found"}).decode(), not failed
  
-        return json.dumps({
+        return orjson.dumps({
             "found": True,
             "meeting": meeting_obj or {},
             "contact": contact_obj or {},
             "companies": companies,
             "deals": deals
-        }, ensure_ascii=False)
\ No newline at end of file
+        }).decode(), not failed
+ 
+    def _batch_read(self, client: HubSpot, object_type: str, ids: List[str]) -> list:
+        """
+        Read several companies or deals in a single batch request.
+        """
+        if object_type == "companies":
+            batch_api, batch_input, object_id = client.crm.companies.batch_api, CompanyBatchReadInput, CompanyObjectId
+        else:
+            batch_api, batch_input, object_id = client.crm.deals.batch_api, DealBatchReadInput, DealObjectId
+        res = call_hubspot(
+            batch_api.read,
+            batch_read_input_simple_public_object_id=batch_input(
+                inputs=[object_id(id=i) for i in ids], properties=[], properties_with_history=[]
+            )
+        )
+        return res.results or []